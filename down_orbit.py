@@ -3,48 +3,131 @@
 """
 Sync ASF AUX_POEORB directory with Earthdata Login (EDL) authentication.
 - First run: downloads all matching files (default: *.EOF)
-- Next runs: only downloads files that are new or have changed size
+- Next runs: files whose local size+mtime still match the manifest are trusted without
+  contacting the server; only new, missing or locally changed files are checked/downloaded.
+  Server-side changes to already-synced files are only picked up with --force-probe.
 - Preserves server Last-Modified time on local files
 - Auth via --user/--password OR EARTHDATA_USERNAME/EARTHDATA_PASSWORD envs OR ~/.netrc
 - Robust to EDL redirects (manual hop-following; only sends auth on auth hosts)
 """
 
 import argparse
+import asyncio
+import base64
+import functools
+import hashlib
 import os
 import re
+import socket
 import sys
 import time
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from html.parser import HTMLParser
-from urllib.parse import urljoin, urlparse
-from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin, urlsplit
+from email.utils import formatdate, parsedate_to_datetime
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
+
+try:
+    from lxml import etree  # optional: C-backed incremental HTML parser
+except ImportError:
+    etree = None
+
+try:
+    import orjson  # optional: faster manifest (de)serialization
+except ImportError:
+    orjson = None
+
+try:
+    import httpx  # optional: HTTP/2 probe stage (pip install "httpx[http2]")
+except ImportError:
+    httpx = None
 
 BASE_URL = "https://s1qc.asf.alaska.edu/aux_poeorb/"
 DEFAULT_PATTERN = r".*\.EOF$"
 MANIFEST_NAME = ".sync_manifest.json"
-CHUNK_SIZE = 1024 * 1024  # 1 MiB
+CHUNK_SIZE = 4 * 1024 * 1024  # 4 MiB
+LISTING_CHUNK_SIZE = 64 * 1024  # 64 KiB fed to the HTML parser at a time
 TIMEOUT = 90
+PROBE_WORKERS = 16  # concurrent HEAD probes
+POOL_CONNECTIONS = 32  # per-host pools kept (EDL hops span several hosts)
+POOL_MAXSIZE = 64      # keep-alive sockets per host; must cover concurrent workers
+HTTP2_MAX_CONNECTIONS = 4  # --http2: streams are multiplexed, so a few connections suffice
+HTTP2_MAX_PROBES = 64      # --http2: probes in flight at once across those connections
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.5  # seconds, doubled on each retry
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "aux-poeorb-sync/1.3 (+https://asf.alaska.edu)",
+    "Accept": "*/*",
+    "Accept-Encoding": "identity",  # avoid gzip confusing ranged size
+}
 
 # EDL / ASF auth hosts where credentials are required
-EDL_HOSTS = {
+EDL_HOSTS = frozenset({
     "urs.earthdata.nasa.gov",
     "auth.asf.alaska.edu",
-}
+})
+EDL_SUFFIXES = tuple("." + h for h in EDL_HOSTS)  # subdomains of the above
 
 # --------------------- HTML directory listing parser ---------------------
-class LinkExtractor(HTMLParser):
-    def __init__(self):
-        super().__init__()
+class _LinkCollector:
+    """Collects (href, absolute_url) for file links whose href satisfies match."""
+    def __init__(self, base_url, match):
+        self.base_url = base_url
+        self.match = match
         self.links = []
 
+    def add(self, href):
+        # Skip directories (incl. "../" and "/") and non-matching names in the same pass
+        if href and not href.endswith("/") and self.match(href):
+            self.links.append((href, urljoin(self.base_url, href)))
+
+class LinkExtractor(_LinkCollector, HTMLParser):
+    def __init__(self, base_url, match):
+        _LinkCollector.__init__(self, base_url, match)
+        HTMLParser.__init__(self)
+
     def handle_starttag(self, tag, attrs):
         if tag.lower() == "a":
-            href = dict(attrs).get("href")
-            if href:
-                self.links.append(href)
+            self.add(dict(attrs).get("href"))
+
+class LxmlLinkExtractor(_LinkCollector):
+    """Same feed()/close()/links interface as LinkExtractor, backed by lxml's incremental C parser."""
+    def __init__(self, base_url, match):
+        super().__init__(base_url, match)
+        self._parser = etree.HTMLPullParser(events=("end",), tag="a")
+        self._fed = False
+
+    def _collect(self):
+        for _, el in self._parser.read_events():
+            self.add(el.get("href"))
+            # Drop what the parser has passed so the listing DOM never accumulates
+            el.clear()
+            node = el
+            parent = node.getparent()
+            while parent is not None:
+                while node.getprevious() is not None:
+                    del parent[0]
+                node, parent = parent, parent.getparent()
+
+    def feed(self, data):
+        if data:
+            self._parser.feed(data)
+            self._fed = True
+            self._collect()
+
+    def close(self):
+        # lxml raises "no element found" on an empty document; stdlib just yields no links
+        if self._fed:
+            self._parser.close()
+            self._collect()
 
 # --------------------- Session / Auth helpers ---------------------
 def resolve_creds(cli_user: str | None, cli_pass: str | None):
@@ -55,19 +138,30 @@ def resolve_creds(cli_user: str | None, cli_pass: str | None):
 
 def build_session():
     s = requests.Session()
-    s.headers.update({
-        "User-Agent": "aux-poeorb-sync/1.3 (+https://asf.alaska.edu)",
-        "Accept": "*/*",
-        "Accept-Encoding": "identity",  # avoid gzip confusing ranged size
-    })
+    s.headers.update(DEFAULT_HEADERS)
     s.trust_env = True  # respect proxies/.netrc if present
+    # One shared adapter for the whole run; re-mounting would discard its pools
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=Retry(
+            total=RETRY_TOTAL,
+            backoff_factor=RETRY_BACKOFF,
+            status_forcelist=RETRY_STATUSES,
+            raise_on_status=False,  # hand the last response back to raise_for_status
+        ),
+    )
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
     return s
 
-def same_origin(host: str, hostset: set[str]) -> bool:
-    return any(h == host or host.endswith("." + h) for h in hostset)
+def same_origin(host: str) -> bool:
+    """True if host is one of EDL_HOSTS or a subdomain of one."""
+    return host in EDL_HOSTS or host.endswith(EDL_SUFFIXES)
 
-def get_with_edl(
+def request_with_edl(
     session: requests.Session,
+    method: str,
     url: str,
     username: str | None,
     password: str | None,
@@ -78,20 +172,22 @@ def get_with_edl(
 ) -> requests.Response:
     """
     Manually follow redirects. Only present HTTP BasicAuth when the current hop's host
-    is an Earthdata/ASF auth host. Carries cookies between hops. Returns the final Response.
+    is an Earthdata/ASF auth host. Carries cookies between hops. Returns the final Response
+    (200/206, or 304 when the caller sent conditional headers).
     """
     headers = headers or {}
     current = url
     auth = HTTPBasicAuth(username, password) if (username and password) else None
+    # Host classification only changes on absolute/protocol-relative redirects
+    on_edl = same_origin(urlsplit(current).hostname or "")
 
     for _ in range(max_hops):
-        host = urlparse(current).hostname or ""
-        use_auth = auth if same_origin(host, EDL_HOSTS) else None
+        use_auth = auth if on_edl else None
 
-        r = session.get(current, allow_redirects=False, timeout=TIMEOUT, stream=stream, headers=headers, auth=use_auth)
+        r = session.request(method, current, allow_redirects=False, timeout=TIMEOUT, stream=stream, headers=headers, auth=use_auth)
         status = r.status_code
 
-        if status in (200, 206):
+        if status in (200, 206, 304):
             return r
 
         if status in (301, 302, 303, 307, 308):
@@ -103,17 +199,19 @@ def get_with_edl(
                 r.close()
             except Exception:
                 pass
+            if "//" in loc:
+                on_edl = same_origin(urlsplit(nxt).hostname or "")
             current = nxt
             continue
 
         # If 401 at auth host and no creds were sent, retry once with creds
-        if status == 401 and same_origin(host, EDL_HOSTS) and use_auth is None and auth is not None:
+        if status == 401 and on_edl and use_auth is None and auth is not None:
             try:
                 r.close()
             except Exception:
                 pass
-            r = session.get(current, allow_redirects=False, timeout=TIMEOUT, stream=stream, headers=headers, auth=auth)
-            if r.status_code in (200, 206):
+            r = session.request(method, current, allow_redirects=False, timeout=TIMEOUT, stream=stream, headers=headers, auth=auth)
+            if r.status_code in (200, 206, 304):
                 return r
             if r.status_code in (301, 302, 303, 307, 308):
                 loc = r.headers.get("Location")
@@ -124,6 +222,8 @@ def get_with_edl(
                     r.close()
                 except Exception:
                     pass
+                if "//" in loc:
+                    on_edl = same_origin(urlsplit(nxt).hostname or "")
                 current = nxt
                 continue
             r.raise_for_status()
@@ -132,149 +232,468 @@ def get_with_edl(
 
     raise RuntimeError("Exceeded maximum EDL redirect hops")
 
+def get_with_edl(session, url, username, password, **kwargs) -> requests.Response:
+    return request_with_edl(session, "GET", url, username, password, **kwargs)
+
+def head_with_edl(session, url, username, password, **kwargs) -> requests.Response:
+    """HEAD counterpart of get_with_edl: same hop/auth handling, no response body."""
+    return request_with_edl(session, "HEAD", url, username, password, **kwargs)
+
 # --------------------- Remote listing / metadata ---------------------
+# Patterns of the form .*<literal suffix>$ (like the default .*\.EOF$) need no regex engine
+_SUFFIX_ONLY = re.compile(r"\.\*((?:\\\.|[A-Za-z0-9_-])+)\$")
+
+def compile_matcher(pattern):
+    """Return a callable(name) that is truthy when pattern matches name (re.match semantics)."""
+    m = _SUFFIX_ONLY.fullmatch(pattern)
+    if m:
+        suffix = m.group(1).replace("\\.", ".")
+        return lambda name: name.endswith(suffix)
+    return re.compile(pattern, re.ASCII).match  # EOF names are ASCII; skip Unicode-aware matching
+
 def list_remote_files(session, base_url, pattern, username, password):
-    r = get_with_edl(session, base_url, username, password, stream=False)
-    html = r.text
-    r.close()
+    extractor = LxmlLinkExtractor if etree is not None else LinkExtractor
+    parser = extractor(base_url, compile_matcher(pattern))
 
-    parser = LinkExtractor()
-    parser.feed(html)
+    # Feed the listing to the parser as it arrives instead of materializing r.text
+    r = get_with_edl(session, base_url, username, password, stream=True)
+    try:
+        if r.encoding is None:
+            r.encoding = "utf-8"
+        for chunk in r.iter_content(LISTING_CHUNK_SIZE, decode_unicode=True):
+            parser.feed(chunk)
+        parser.close()
+    finally:
+        r.close()
 
-    rx = re.compile(pattern)
-    items = []
-    for href in parser.links:
-        if href in ("../", "/"):
-            continue
-        if href.endswith("/"):
-            continue
-        name = href
-        url = urljoin(base_url, href)
-        if rx.match(name):
-            items.append((name, url))
+    # de-dup by name (first link wins) + sort; plain tuple sort needs no key function
+    seen = {}
+    for name, url in parser.links:
+        seen.setdefault(name, url)
+    return sorted(seen.items())
 
-    # de-dup + sort
-    return sorted(set(items), key=lambda x: x[0])
+@functools.lru_cache(maxsize=16384)
+def _lm_to_epoch(s: str) -> int:
+    """Last-Modified header -> epoch seconds. Cached: AUX_POEORB files often share upload times."""
+    return int(parsedate_to_datetime(s).timestamp())
 
-def probe_size_mtime(session, url, username, password):
+def _parse_size_mtime(headers, info, ranged=False):
     """
-    Use Range: bytes=0-0 to get total size from Content-Range and capture Last-Modified.
-    Returns dict: {"content_length": int|None, "last_modified": int|None}
+    Fill missing content_length/last_modified/etag in info from response headers.
+    ranged: headers belong to a 206 answer to Range: bytes=0-0, whose Content-Length is
+    the 1-byte slice rather than the file size.
     """
-    info = {"content_length": None, "last_modified": None}
-    # First try ranged GET
-    headers = {"Range": "bytes=0-0", "Accept-Encoding": "identity"}
-    r = get_with_edl(session, url, username, password, headers=headers, stream=True)
-    try:
+    if info["content_length"] is None:
         # Accept either 206 (partial) or 200 (some servers ignore Range)
-        cr = r.headers.get("Content-Range")
+        cr = headers.get("Content-Range")
         if cr and "/" in cr:
             try:
                 info["content_length"] = int(cr.split("/")[-1])
             except Exception:
                 pass
 
-        if info["content_length"] is None:
-            cl = r.headers.get("Content-Length")
-            if cl:
-                try:
-                    cl_int = int(cl)
-                    if cl_int > 1:  # if server honored range, CL might be 1
-                        info["content_length"] = cl_int
-                except Exception:
-                    pass
+    if info["content_length"] is None and not ranged:
+        cl = headers.get("Content-Length")
+        if cl:
+            try:
+                info["content_length"] = int(cl)
+            except Exception:
+                pass
+
+    if info["etag"] is None:
+        info["etag"] = headers.get("ETag")
 
-        lm = r.headers.get("Last-Modified")
+    if info["last_modified"] is None:
+        lm = headers.get("Last-Modified")
         if lm:
             try:
-                info["last_modified"] = int(parsedate_to_datetime(lm).timestamp())
+                info["last_modified"] = _lm_to_epoch(lm)
             except Exception:
                 pass
-    finally:
+
+def etag_key(etag):
+    """ETag in comparable form: weak validators (W/"...") compare equal to their strong twin."""
+    if etag and etag.startswith("W/"):
+        return etag[2:]
+    return etag
+
+_HEX_DIGEST = re.compile(r"[0-9a-f]{32}|[0-9a-f]{64}")
+
+def remote_digest(headers, whole_body=True):
+    """
+    Server-advertised content checksum as (algo, hexdigest), or None.
+    Uses Content-MD5 (only meaningful on whole-body responses) or a strong ETag that is a
+    bare md5/sha256 hex string, as S3-style stores emit for single-part objects.
+    """
+    md5_b64 = headers.get("Content-MD5") if whole_body else None
+    if md5_b64:
         try:
-            r.close()
-        except Exception:
+            raw = base64.b64decode(md5_b64, validate=True)
+            if len(raw) == 16:
+                return "md5", raw.hex()
+        except ValueError:
             pass
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        tag = etag.strip('"').lower()
+        if _HEX_DIGEST.fullmatch(tag):
+            return ("md5" if len(tag) == 32 else "sha256"), tag
+    return None
+
+def probe_size_mtime(session, url, username, password, abort=None):
+    """
+    HEAD the file to read Content-Length and Last-Modified without opening a body.
+    Falls back to a single Range: bytes=0-0 GET (size from Content-Range) when the server
+    rejects HEAD or omits either header; never more than one fallback request.
+    If the probe fails, a WARNING is written and the partial info returned, so one bad
+    file doesn't abort the probe stage. Raises RuntimeError instead of starting a request
+    once abort is set.
+    Returns dict: {"content_length": int|None, "last_modified": int|None,
+                   "etag": str|None, "digest": (algo, hexdigest)|None}
+    """
+    info = {"content_length": None, "last_modified": None, "etag": None, "digest": None}
+    if abort is not None and abort.is_set():
+        raise RuntimeError("Aborted")
+    try:
+        r = head_with_edl(session, url, username, password)
+    except requests.RequestException as e:
+        # Some servers (or presigned redirect targets) refuse HEAD outright; anything else
+        # (404, connection error, ...) would fail the ranged GET just the same
+        if not isinstance(e, requests.HTTPError) or e.response is None or e.response.status_code not in (403, 405, 501):
+            sys.stderr.write(f"WARNING: probe failed for {url}: {e}\n")
+            return info
+    else:
+        try:
+            _parse_size_mtime(r.headers, info)
+            info["digest"] = remote_digest(r.headers)
+        finally:
+            r.close()
 
-    # Last fallback: plain GET headers (no body read)
     if info["content_length"] is None or info["last_modified"] is None:
-        r2 = get_with_edl(session, url, username, password, stream=True)
+        if abort is not None and abort.is_set():
+            raise RuntimeError("Aborted")
+        headers = {"Range": "bytes=0-0", "Accept-Encoding": "identity"}
         try:
-            if info["content_length"] is None:
-                cl = r2.headers.get("Content-Length")
-                if cl:
-                    try:
-                        info["content_length"] = int(cl)
-                    except Exception:
-                        pass
-            if info["last_modified"] is None:
-                lm = r2.headers.get("Last-Modified")
-                if lm:
-                    try:
-                        info["last_modified"] = int(parsedate_to_datetime(lm).timestamp())
-                    except Exception:
-                        pass
+            r = get_with_edl(session, url, username, password, headers=headers, stream=True)
+        except requests.RequestException as e:
+            sys.stderr.write(f"WARNING: HEAD and ranged GET both failed for {url}: {e}\n")
+            return info
+        try:
+            _parse_size_mtime(r.headers, info, ranged=(r.status_code == 206))
+            if info["digest"] is None:
+                info["digest"] = remote_digest(r.headers, whole_body=(r.status_code == 200))
         finally:
             try:
-                r2.close()
+                r.close()
             except Exception:
                 pass
 
+    _warn_missing(info, url)
     return info
 
+def _warn_missing(info, url):
+    # No further requests: say what is missing instead of probing yet again
+    missing = [k for k in ("content_length", "last_modified") if info[k] is None]
+    if missing:
+        sys.stderr.write(f"WARNING: server did not report {' or '.join(missing)} for {url}\n")
+
+# --------------------- Optional HTTP/2 probe stage (httpx) ---------------------
+async def arequest_with_edl(client, method, url, auth, netrc_auth, *, headers=None, stream=False, max_hops=15):
+    """
+    Async counterpart of request_with_edl for an httpx.AsyncClient. auth (BasicAuth) is only
+    sent to EDL hosts; other hops fall back to netrc_auth, as requests does with ~/.netrc.
+    RETRY_STATUSES are retried with backoff like the requests adapter does. With stream=True
+    the body is left unread and the caller must aclose() the response.
+    """
+    current = url
+    on_edl = same_origin(urlsplit(current).hostname or "")
+    hops = retries = 0
+
+    while hops < max_hops:
+        use_auth = auth if (on_edl and auth is not None) else netrc_auth
+        req = client.build_request(method, current, headers=headers)
+        r = await client.send(req, auth=use_auth, stream=stream)
+        if r.status_code in (200, 206, 304):
+            return r
+        await r.aclose()
+        if r.status_code in RETRY_STATUSES and retries < RETRY_TOTAL:
+            await asyncio.sleep(RETRY_BACKOFF * (2 ** retries))
+            retries += 1
+            continue
+        if r.status_code in (301, 302, 303, 307, 308):
+            loc = r.headers.get("Location")
+            if not loc:
+                r.raise_for_status()
+            nxt = urljoin(current, loc)
+            if "//" in loc:
+                on_edl = same_origin(urlsplit(nxt).hostname or "")
+            current = nxt
+            hops += 1
+            continue
+        r.raise_for_status()
+
+    raise RuntimeError("Exceeded maximum EDL redirect hops")
+
+async def aprobe_size_mtime(client, url, auth, netrc_auth):
+    """probe_size_mtime over httpx: HEAD, then at most one ranged GET (headers only)."""
+    info = {"content_length": None, "last_modified": None, "etag": None, "digest": None}
+    try:
+        r = await arequest_with_edl(client, "HEAD", url, auth, netrc_auth)
+    except httpx.HTTPError as e:
+        if not isinstance(e, httpx.HTTPStatusError) or e.response.status_code not in (403, 405, 501):
+            sys.stderr.write(f"WARNING: probe failed for {url}: {e}\n")
+            return info
+    else:
+        _parse_size_mtime(r.headers, info)
+        info["digest"] = remote_digest(r.headers)
+
+    if info["content_length"] is None or info["last_modified"] is None:
+        headers = {"Range": "bytes=0-0", "Accept-Encoding": "identity"}
+        try:
+            r = await arequest_with_edl(client, "GET", url, auth, netrc_auth, headers=headers, stream=True)
+        except httpx.HTTPError as e:
+            sys.stderr.write(f"WARNING: HEAD and ranged GET both failed for {url}: {e}\n")
+            return info
+        try:
+            _parse_size_mtime(r.headers, info, ranged=(r.status_code == 206))
+            if info["digest"] is None:
+                info["digest"] = remote_digest(r.headers, whole_body=(r.status_code == 200))
+        finally:
+            await r.aclose()
+
+    _warn_missing(info, url)
+    return info
+
+async def probe_all(client, urls, auth, netrc_auth):
+    sem = asyncio.Semaphore(HTTP2_MAX_PROBES)
+
+    async def probe(url):
+        async with sem:
+            return await aprobe_size_mtime(client, url, auth, netrc_auth)
+
+    return await asyncio.gather(*(probe(u) for u in urls))
+
+def probe_http2(items, username, password):
+    """
+    Probe all (name, url) items concurrently over a few multiplexed HTTP/2 connections.
+    Returns {name: info}. Raises ImportError if httpx/h2 are unavailable.
+    """
+    if httpx is None:
+        raise ImportError("httpx is not installed")
+    auth = httpx.BasicAuth(username, password) if (username and password) else None
+    try:
+        netrc_auth = httpx.NetRCAuth()
+    except Exception:
+        netrc_auth = None
+
+    async def run():
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(max_connections=HTTP2_MAX_CONNECTIONS, max_keepalive_connections=HTTP2_MAX_CONNECTIONS),
+            retries=RETRY_TOTAL,  # connect errors only; status retries live in arequest_with_edl
+        )
+        async with httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            transport=transport,
+            timeout=httpx.Timeout(TIMEOUT, pool=None),  # probes queue for streams; don't time out waiting
+            follow_redirects=False,
+        ) as client:
+            return await probe_all(client, [url for _, url in items], auth, netrc_auth)
+
+    infos = asyncio.run(run())
+    return {name: info for (name, _), info in zip(items, infos)}
+
 # --------------------- Local helpers ---------------------
 def ensure_dir(path): os.makedirs(path, exist_ok=True)
 
+class AbortSignal(threading.Event):
+    """
+    Ctrl-C flag shared with worker threads. set() also shuts down the sockets of tracked
+    in-flight downloads, so a worker blocked in a read wakes up instead of waiting out TIMEOUT.
+    """
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._responses = set()
+
+    def track(self, r):
+        with self._lock:
+            self._responses.add(r)
+
+    def untrack(self, r):
+        with self._lock:
+            self._responses.discard(r)
+
+    def set(self):
+        super().set()
+        with self._lock:
+            responses = list(self._responses)
+        for r in responses:
+            sock = getattr(getattr(r.raw, "connection", None), "sock", None)
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+def abandon_pool(ex, futures, abort):
+    """Ctrl-C: stop in-flight work, cancel queued futures and wait for the workers to exit."""
+    abort.set()
+    for fut in futures:
+        fut.cancel()
+    ex.shutdown(wait=True)
+
 def load_manifest(dest_dir):
     path = os.path.join(dest_dir, MANIFEST_NAME)
     if os.path.exists(path):
         try:
+            if orjson is not None:
+                with open(path, "rb") as f:
+                    return orjson.loads(f.read())
             with open(path, "r", encoding="utf-8") as f:
                 return json.load(f)
         except Exception:
             return {}
     return {}
 
-def save_manifest(dest_dir, data):
+def save_manifest(dest_dir, data, pretty=False):
+    """Write compact JSON (indented + sorted if pretty) via a temp file + atomic rename."""
     path = os.path.join(dest_dir, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, sort_keys=True)
+        if orjson is not None:
+            payload = orjson.dumps(data, option=(orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS) if pretty else 0)
+        elif pretty:
+            payload = json.dumps(data, indent=2, sort_keys=True).encode("utf-8")
+        else:
+            payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        # an interrupted run leaves the previous manifest intact instead of a truncated one
+        os.replace(tmp_path, path)
     except Exception as e:
         sys.stderr.write(f"WARNING: couldn't save manifest: {e}\n")
 
-def needs_download(local_path, expected_size):
-    if not os.path.exists(local_path):
+def scan_local(dest_dir):
+    """Map filename -> os.stat_result for regular files in dest_dir, in one directory pass."""
+    index = {}
+    with os.scandir(dest_dir) as it:
+        for e in it:
+            if e.is_file():
+                index[e.name] = e.stat()
+    return index
+
+def needs_download(local_stat, expected_size):
+    if local_stat is None:
         return True
     if expected_size is None:
         # if we don't know, conservatively skip (assume it's already present)
         return False
+    return local_stat.st_size != expected_size
+
+def matches_manifest(entry, local_stat):
+    """True if the local file still has the size and mtime the manifest recorded for it."""
+    if not entry or local_stat is None or entry.get("size") is None or entry.get("last_modified") is None:
+        return False
+    return local_stat.st_size == entry["size"] and int(local_stat.st_mtime) == entry["last_modified"]
+
+def file_digest(path, algo="sha256"):
+    h = hashlib.new(algo)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def digest_matches(path, algo, expected):
     try:
-        return os.path.getsize(local_path) != expected_size
-    except Exception:
-        return True
+        return file_digest(path, algo) == expected
+    except OSError:
+        return False
 
 def set_mtime(local_path, epoch):
     if epoch is None:
         return
+    epoch_ns = int(epoch * 1_000_000_000)
     try:
-        os.utime(local_path, (epoch, epoch))
+        os.utime(local_path, ns=(epoch_ns, epoch_ns))
     except Exception:
         pass
 
 # --------------------- Downloader ---------------------
-def download_file(session, url, dest_path, expected_size, username, password):
+def download_file(session, url, dest_path, expected_size, username, password, *,
+                  if_modified_since=None, if_none_match=None, fsync=False, verify=False, abort=None):
+    """
+    Stream url into dest_path via a .part file. With if_modified_since (epoch) and/or
+    if_none_match (ETag), the GET is conditional and a 304 leaves dest_path untouched.
+    fsync flushes the file to disk before it is renamed into place.
+    The sha256 of the body is computed in the same loop that writes it. With verify, the
+    body is also checked against the response's Content-MD5/hex ETag (if any) in that loop,
+    so no second read of the file is needed. Once abort (AbortSignal) is set the transfer
+    stops, the .part file is removed and RuntimeError is raised.
+    Returns dict: {"not_modified": bool, "size": int|None, "last_modified": str|None,
+                   "etag": str|None, "sha256": str|None}
+    """
+    headers = {}
+    if if_modified_since is not None:
+        headers["If-Modified-Since"] = formatdate(if_modified_since, usegmt=True)
+    if if_none_match:
+        headers["If-None-Match"] = if_none_match
+
     tmp_path = dest_path + ".part"
     bytes_written = 0
-    r = get_with_edl(session, url, username, password, stream=True)
+    r = get_with_edl(session, url, username, password, headers=headers, stream=True)
+    if abort is not None:
+        abort.track(r)
     try:
         r.raise_for_status()
-        with open(tmp_path, "wb") as out:
+        etag = r.headers.get("ETag")
+        # A 200 carrying the ETag we already have means the server ignored If-None-Match
+        if r.status_code == 304 or (if_none_match and etag_key(etag) == etag_key(if_none_match)):
+            return {"not_modified": True, "size": None, "last_modified": r.headers.get("Last-Modified"),
+                    "etag": etag, "sha256": None}
+        if expected_size is None:
+            # Unprobed file: the response itself says how much to expect
+            try:
+                expected_size = int(r.headers["Content-Length"])
+            except (KeyError, ValueError):
+                pass
+        # Raw fd: chunks are already large, so Python's buffered writer only adds a copy
+        h = hashlib.sha256()
+        check = remote_digest(r.headers, whole_body=(r.status_code == 200)) if verify else None
+        check_h = hashlib.new(check[0]) if check is not None and check[0] != "sha256" else None
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+        aborted = False
+        try:
             for chunk in r.iter_content(CHUNK_SIZE):
+                if abort is not None and abort.is_set():
+                    aborted = True
+                    break
                 if chunk:
-                    out.write(chunk)
+                    view = memoryview(chunk)
+                    while view:
+                        view = view[os.write(fd, view):]
+                    h.update(chunk)
+                    if check_h is not None:
+                        check_h.update(chunk)
                     bytes_written += len(chunk)
+            if fsync and not aborted:
+                os.fsync(fd)
+        except Exception:
+            # A read cut short by abort.set() surfaces as a connection error
+            if abort is None or not abort.is_set():
+                raise
+            aborted = True
+        finally:
+            os.close(fd)
+        if aborted:
+            try:
+                os.remove(tmp_path)
+            except Exception:
+                pass
+            raise RuntimeError("Aborted")
     finally:
+        if abort is not None:
+            abort.untrack(r)
         try:
             r.close()
         except Exception:
@@ -287,10 +706,19 @@ def download_file(session, url, dest_path, expected_size, username, password):
             pass
         raise RuntimeError(f"Incomplete download: got {bytes_written}, expected {expected_size}")
 
+    if check is not None:
+        got = (check_h or h).hexdigest()
+        if got != check[1]:
+            try:
+                os.remove(tmp_path)
+            except Exception:
+                pass
+            raise RuntimeError(f"Checksum mismatch: {check[0]} {got}, server says {check[1]}")
+
     os.replace(tmp_path, dest_path)
     # Return Last-Modified for final timestamping
-    lm = r.headers.get("Last-Modified")
-    return lm
+    return {"not_modified": False, "size": bytes_written, "last_modified": r.headers.get("Last-Modified"),
+            "etag": etag, "sha256": h.hexdigest()}
 
 # --------------------- Main ---------------------
 def main():
@@ -302,16 +730,31 @@ def main():
     ap.add_argument("--user", help="Earthdata username (else uses env or ~/.netrc)")
     ap.add_argument("--password", help="Earthdata password (else uses env or ~/.netrc)")
     ap.add_argument("--verbose", action="store_true", help="Print extra info")
+    ap.add_argument("--force-probe", action="store_true", help="Re-check every file with the server, even if the manifest says it is in sync")
+    ap.add_argument("--pretty-manifest", action="store_true", help="Write the manifest indented with sorted keys (default: compact)")
+    ap.add_argument("--fsync", action="store_true", help="fsync each downloaded file before renaming it into place")
+    ap.add_argument("--verify", action="store_true", help="Check each download against the server's Content-MD5/ETag checksum, when provided")
+    ap.add_argument("--http2", action="store_true", help='Probe metadata over multiplexed HTTP/2 (requires "httpx[http2]")')
+    ap.add_argument("--workers", type=int, default=8, help=f"Parallel downloads (default: 8, max: {POOL_MAXSIZE})")
     args = ap.parse_args()
+    if args.workers < 1:
+        ap.error("--workers must be at least 1")
+    if args.workers > POOL_MAXSIZE:
+        # More workers than pooled sockets just makes urllib3 discard connections
+        sys.stderr.write(f"WARNING: --workers {args.workers} exceeds the connection pool; using {POOL_MAXSIZE}\n")
+        args.workers = POOL_MAXSIZE
 
     username, password = resolve_creds(args.user, args.password)
     if args.verbose:
         print(f"Using creds: {'CLI/env' if (username and password) else '~/.netrc or challenge-based'}")
 
     session = build_session()
+    abort = AbortSignal()  # set on Ctrl-C so worker threads stop promptly
     ensure_dir(args.dest)
+    dest_prefix = os.path.join(args.dest, "")  # local paths are dest_prefix + name
     manifest = load_manifest(args.dest)
     manifest.setdefault("files", {})
+    local_index = scan_local(args.dest)
 
     print(f"Listing: {args.url}")
     items = list_remote_files(session, args.url, args.pattern, username, password)
@@ -319,64 +762,169 @@ def main():
         print("No matching files found (check pattern or credentials).")
         return
 
+    # Files already synced (manifest size+mtime still match on disk) need no request at all.
+    # Other manifest-known files skip the probe: a single conditional GET below (If-None-Match
+    # with the recorded ETag, If-Modified-Since with the recorded mtime) either confirms them
+    # unchanged (304) or fetches the new content.
+    to_probe = []
     to_download = []
     for name, url in items:
-        info = probe_size_mtime(session, url, username, password)
-        local_path = os.path.join(args.dest, name)
-        if needs_download(local_path, info["content_length"]):
-            to_download.append((name, url, info))
-        elif args.verbose:
+        entry = manifest["files"].get(name)
+        if entry is None:
+            to_probe.append((name, url))
+            continue
+        st = local_index.get(name)
+        if not args.force_probe and matches_manifest(entry, st):
+            if args.verbose:
+                print(f"Up-to-date: {name}")
+            continue
+        # Only revalidate when the local copy is intact; otherwise fetch it outright
+        prev = None
+        if st is not None and st.st_size == entry.get("size"):
+            sha = entry.get("sha256")
+            local_path = dest_prefix + name
+            if sha is None:
+                prev = entry
+            elif digest_matches(local_path, "sha256", sha):
+                if not args.force_probe:
+                    # Only the mtime drifted; the recorded hash proves the content is intact
+                    if not args.dry_run:
+                        set_mtime(local_path, entry.get("last_modified"))
+                    if args.verbose:
+                        print(f"Up-to-date: {name}")
+                    continue
+                prev = entry
+            elif args.verbose:
+                print(f"Checksum mismatch: {name}")
+        to_download.append((name, url, {"content_length": None, "last_modified": None, "etag": None}, prev))
+
+    # Probes are independent header-only requests; run them concurrently
+    infos = None
+    if args.http2 and to_probe:
+        try:
+            infos = probe_http2(to_probe, username, password)
+        except ImportError as e:
+            sys.stderr.write(f"WARNING: --http2 unavailable ({e}); probing with threads\n")
+    if infos is None:
+        # No `with`: its exit would run every queued probe before an error or Ctrl-C surfaces
+        ex = ThreadPoolExecutor(max_workers=PROBE_WORKERS)
+        futures = [ex.submit(probe_size_mtime, session, url, username, password, abort) for _, url in to_probe]
+        try:
+            infos = {name: fut.result() for (name, _), fut in zip(to_probe, futures)}
+        except BaseException:
+            abandon_pool(ex, futures, abort)
+            raise
+        ex.shutdown()
+
+    manifest_lock = threading.Lock()
+
+    for name, url in to_probe:
+        info = infos[name]
+        if needs_download(local_index.get(name), info["content_length"]):
+            to_download.append((name, url, info, None))
+            continue
+        if info["digest"] is not None and not digest_matches(dest_prefix + name, *info["digest"]):
+            # Same size, but the server's checksum says the local bytes differ
+            if args.verbose:
+                print(f"Checksum mismatch: {name}")
+            to_download.append((name, url, info, None))
+            continue
+        if args.verbose:
             print(f"Up-to-date: {name}")
+        # Adopt files we didn't download (existing trees, lost manifest) so the next run
+        # can skip them without a request; needs both size and mtime to be checkable
+        if not args.dry_run and info["content_length"] is not None and info["last_modified"] is not None:
+            set_mtime(dest_prefix + name, info["last_modified"])
+            with manifest_lock:
+                manifest["files"][name] = {
+                    "size": info["content_length"],
+                    "last_modified": info["last_modified"],
+                    "url": url,
+                    "etag": info["etag"],
+                }
 
     if not to_download:
         print("Everything is up to date. No downloads needed.")
         # update manifest timestamp so you know when you checked
         manifest["last_sync"] = int(time.time())
-        save_manifest(args.dest, manifest)
+        save_manifest(args.dest, manifest, pretty=args.pretty_manifest)
         return
 
     print(f"{len(to_download)} file(s) to download:")
-    for name, _, info in to_download:
+    for name, _, info, prev in to_download:
         size = info["content_length"]
-        size_str = f"{size:,} B" if size is not None else "unknown size"
+        if prev is not None:
+            size_str = "if modified"
+        else:
+            size_str = f"{size:,} B" if size is not None else "unknown size"
         print(f"  - {name} ({size_str})")
 
     if args.dry_run:
         print("\nDry run complete. Nothing downloaded.")
         return
 
-    for name, url, info in to_download:
-        local_path = os.path.join(args.dest, name)
-        if args.verbose:
-            print(f"Downloading {name} -> {local_path}")
-        else:
-            print(f"Downloading {name} ... ", end="", flush=True)
-        try:
-            lm_hdr = download_file(session, url, local_path, info["content_length"], username, password)
-            # choose a timestamp: prefer header from download, else probe
-            lm_epoch = None
-            for candidate in (lm_hdr,):
-                if candidate:
-                    try:
-                        lm_epoch = int(parsedate_to_datetime(candidate).timestamp())
-                        break
-                    except Exception:
-                        pass
-            if lm_epoch is None:
-                lm_epoch = info["last_modified"]
-            set_mtime(local_path, lm_epoch)
+    def fetch(name, url, info, prev, local_path):
+        prev = prev or {}
+        result = download_file(session, url, local_path, info["content_length"], username, password,
+                               if_modified_since=prev.get("last_modified"), if_none_match=prev.get("etag"),
+                               fsync=args.fsync, verify=args.verify, abort=abort)
+        if result["not_modified"]:
+            # Content unchanged; only the local mtime had drifted from the manifest
+            set_mtime(local_path, prev.get("last_modified"))
+            return False
+        # choose a timestamp: prefer header from download, else probe
+        lm_epoch = None
+        for candidate in (result["last_modified"],):
+            if candidate:
+                try:
+                    lm_epoch = _lm_to_epoch(candidate)
+                    break
+                except Exception:
+                    pass
+        if lm_epoch is None:
+            lm_epoch = info["last_modified"]
+        set_mtime(local_path, lm_epoch)
+        with manifest_lock:
             manifest["files"][name] = {
-                "size": info["content_length"],
+                "size": result["size"],
                 "last_modified": lm_epoch,
                 "url": url,
+                "etag": result["etag"] or info["etag"],
+                "sha256": result["sha256"],
             }
-            if not args.verbose:
-                print("done.")
-        except Exception as e:
-            print(f"failed: {e}", file=sys.stderr)
+        return True
+
+    # No `with`: its exit would run every queued download before Ctrl-C is honoured
+    ex = ThreadPoolExecutor(max_workers=args.workers)
+    futures = {}
+    try:
+        for name, url, info, prev in to_download:
+            local_path = dest_prefix + name
+            futures[ex.submit(fetch, name, url, info, prev, local_path)] = (name, local_path)
+        # Report each file on a single line as it finishes so workers don't interleave
+        for fut in as_completed(futures):
+            name, local_path = futures[fut]
+            try:
+                downloaded = fut.result()
+            except Exception as e:
+                print(f"Downloading {name} ... failed: {e}", file=sys.stderr)
+                continue
+            if not downloaded:
+                print(f"Unchanged: {name}" if args.verbose else f"Downloading {name} ... not modified.")
+            elif args.verbose:
+                print(f"Downloaded {name} -> {local_path}")
+            else:
+                print(f"Downloading {name} ... done.")
+    except KeyboardInterrupt:
+        abandon_pool(ex, futures, abort)
+        # Keep what already finished so the next run doesn't fetch it again
+        with manifest_lock:
+            save_manifest(args.dest, manifest, pretty=args.pretty_manifest)
+        raise
+    ex.shutdown()
 
     manifest["last_sync"] = int(time.time())
-    save_manifest(args.dest, manifest)
+    save_manifest(args.dest, manifest, pretty=args.pretty_manifest)
     print("Sync complete.")
 
 if __name__ == "__main__":